@@ -4,14 +4,13 @@ ai_advisor.py — Google Gemini 2.0 Flash powered AI financial advisor
 import os
 import re
 import json
+import functools
 import logging
-from typing import Optional
+from typing import Iterator, Optional
 from google import genai
 from google.genai import types, errors as genai_errors
-from dotenv import load_dotenv  # type: ignore
 from market_data import KEYWORD_TO_TICKER  # type: ignore
-
-load_dotenv()
+from core.semantic_cache import SemanticCache  # type: ignore
 
 logger = logging.getLogger(__name__)
 MODEL_NAME = "gemini-2.5-flash-lite"
@@ -22,6 +21,13 @@ if not _GEMINI_API_KEY:
 
 client = genai.Client(api_key=_GEMINI_API_KEY)
 
+EMBEDDING_MODEL = "gemini-embedding-001"
+_EMBED_CONFIG = types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY", output_dimensionality=768)
+
+# Replies to first-turn questions, reused for near-identical questions asked
+# under the same profile and market snapshot.
+_chat_cache = SemanticCache(threshold=0.92, ttl=3600, maxsize=2048)
+
 # ─── Risk Test Questions ────────────────────────────────────────────────────────
 
 RISK_QUESTIONS = [
@@ -51,6 +57,26 @@ RISK_QUESTIONS = [
     "   c) Tengo ingresos variables y alta tolerancia a la incertidumbre",
 ]
 
+# First line of each question (the bold title), as quoted in the evaluation prompt
+_RISK_TITLES: list[str] = [q.split("\n", 1)[0] for q in RISK_QUESTIONS]
+
+
+# Constrained decoding: Gemini returns exactly this JSON object, no markdown fences
+_RISK_RESULT_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "profile": types.Schema(type=types.Type.STRING, enum=["Conservador", "Moderado", "Agresivo"]),
+        "explanation": types.Schema(type=types.Type.STRING),
+        "recommendations": types.Schema(type=types.Type.STRING),
+    },
+    required=["profile", "explanation", "recommendations"],
+)
+_RISK_CONFIG = types.GenerateContentConfig(
+    temperature=0.7,
+    response_mime_type="application/json",
+    response_schema=_RISK_RESULT_SCHEMA,
+)
+
 
 def get_risk_question(question_number: int) -> str:
     if 0 <= question_number < len(RISK_QUESTIONS):
@@ -60,13 +86,27 @@ def get_risk_question(question_number: int) -> str:
 
 def evaluate_risk_profile(answers: list[str], user_name: Optional[str] = None) -> dict:
     try:
-        qa_text = "\n".join([
-            f"P{i+1}: {RISK_QUESTIONS[i].split(chr(10))[0]}\nR{i+1}: {answers[i]}"
-            for i in range(min(len(answers), 5))
-        ])
-        name_part = f"El usuario se llama {user_name}." if user_name else ""
+        # Copy so callers can't mutate the cached dict
+        return dict(_evaluate_risk_profile_cached(tuple(answers), user_name))
+    except Exception as e:
+        logger.error(f"Risk test evaluation error: {e}")
+        return {
+            "profile": "Moderado",
+            "explanation": "No pudimos procesar tu test completamente, pero te asignamos un perfil Moderado por defecto.",
+            "recommendations": "Considera ETFs diversificados como SPY o QQQ como punto de partida.",
+        }
+
+
+@functools.lru_cache(maxsize=1024)
+def _evaluate_risk_profile_cached(answers: tuple[str, ...], user_name: Optional[str]) -> dict:
+    """Gemini evaluation, memoized on the exact answers. Failures raise and are not cached."""
+    qa_text = "\n".join(
+        f"P{i+1}: {_RISK_TITLES[i]}\nR{i+1}: {answers[i]}"
+        for i in range(min(len(answers), len(_RISK_TITLES)))
+    )
+    name_part = f"El usuario se llama {user_name}." if user_name else ""
 
-        prompt = f"""
+    prompt = f"""
 Eres Santi, un asesor financiero cercano y experto. {name_part}
 El usuario acaba de terminar el Test de Perfil de Riesgo:
 
@@ -77,45 +117,44 @@ TAREA:
 2. Explica el resultado de forma cálida y personalizada (2-3 oraciones), como si le hablaras de frente
 3. Da 2 recomendaciones de activos concretas para su perfil, considerando que está en Colombia
 
-Responde EXACTAMENTE en este formato JSON (sin markdown, solo JSON puro):
-{{
-  "profile": "Conservador|Moderado|Agresivo",
-  "explanation": "Tu explicación aquí...",
-  "recommendations": "Tus recomendaciones aquí..."
-}}
+Responde con "profile" (el perfil), "explanation" (la explicación) y "recommendations" (las recomendaciones).
 """
-        config = types.GenerateContentConfig(temperature=0.7)
-        response = client.models.generate_content(
-            model=MODEL_NAME, contents=prompt, config=config
-        )
-
-        text = response.text.strip()
-        text = re.sub(r"```json|```", "", text).strip()
-        data = json.loads(text)
+    response = client.models.generate_content(
+        model=MODEL_NAME, contents=prompt, config=_RISK_CONFIG
+    )
 
-        return {
-            "profile": data.get("profile", "Moderado"),
-            "explanation": data.get("explanation", ""),
-            "recommendations": data.get("recommendations", ""),
-        }
+    data = json.loads(response.text)
 
-    except Exception as e:
-        logger.error(f"Risk test evaluation error: {e}")
-        return {
-            "profile": "Moderado",
-            "explanation": "No pudimos procesar tu test completamente, pero te asignamos un perfil Moderado por defecto.",
-            "recommendations": "Considera ETFs diversificados como SPY o QQQ como punto de partida.",
-        }
+    return {
+        "profile": data.get("profile", "Moderado"),
+        "explanation": data.get("explanation", ""),
+        "recommendations": data.get("recommendations", ""),
+    }
 
 
 # ─── Unified Chat Analysis ──────────────────────────────────────────────────────
 
-def get_unified_analysis(
+def _embed(text: str) -> Optional[list[float]]:
+    """Embed text for semantic cache lookups. Returns None if the call fails."""
+    try:
+        result = client.models.embed_content(
+            model=EMBEDDING_MODEL,
+            contents=text,
+            config=_EMBED_CONFIG,
+        )
+        return list(result.embeddings[0].values)
+    except Exception as e:
+        logger.warning(f"Embedding failed, skipping semantic cache: {type(e).__name__}: {e}")
+        return None
+
+
+def _prepare_chat(
     user_message: str,
     user_profile: str,
-    market_data: Optional[dict] = None,
-    history: Optional[list] = None,
-) -> str:
+    market_data: Optional[dict],
+    history: Optional[list],
+) -> tuple[list[types.Content], types.GenerateContentConfig]:
+    """Build the Gemini contents (sanitized history + current turn) and config."""
 
     # ── Build system prompt ────────────────────────────────────────────────────
     market_context = (
@@ -175,20 +214,61 @@ REGLAS DE SALUDO Y CONTEXTO:
     # Current user turn — always append last
     contents.append(types.Content(role="user", parts=[types.Part(text=user_message)]))
 
-    # ── Call Gemini — only this block is wrapped ───────────────────────────────
-    try:
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=contents,
-            config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                temperature=0.75,
-                max_output_tokens=2048,
-            ),
-        )
-        return response.text
+    config = types.GenerateContentConfig(
+        system_instruction=system_prompt,
+        temperature=0.75,
+        max_output_tokens=2048,
+    )
+    return contents, config
+
 
-    except genai_errors.ClientError as e:
+# Anything that makes a message about *this* user: figures (digits or number
+# words, incl. "lucas"/"palos"), self-introductions and personal finances.
+# Such replies are personal and must never be shared through the cache.
+_PERSONAL_RE = re.compile(
+    r"\d"
+    r"|\b(?:cero|dos|tres|cuatro|cinco|seis|siete|ocho|nueve|diez|once|doce|trece"
+    r"|catorce|quince|dieci\w*|veint\w*|treinta|cuarenta|cincuenta|sesenta|setenta"
+    r"|ochenta|noventa|cien|ciento\w*|\w+cient[oa]s|quinient[oa]s|mil|miles"
+    r"|mill[oó]n\w*|billon\w*|bill[oó]n|medio|lucas?|palos?)\b"
+    r"|\b(?:me llamo|mi nombre|soy|tengo|gano|ganando|cobro|ahorr\w*|sueldo|salario"
+    r"|ingreso\w*|herencia|deuda\w*|edad|a[ñn]os|mi esposa|mi esposo|mis hijos"
+    r"|mi familia|mi hijo|mi hija|jubil\w*|pensi[oó]n)\b",
+    re.IGNORECASE,
+)
+
+
+def _is_generic_question(user_message: str) -> bool:
+    return not _PERSONAL_RE.search(user_message)
+
+
+def _lookup_cached_reply(
+    user_message: str,
+    user_profile: str,
+    market_data: Optional[dict],
+    contents: list[types.Content],
+) -> tuple[Optional[str], Optional[tuple], Optional[list[float]]]:
+    """Semantic cache lookup → (cached reply, namespace, embedding).
+
+    Chat is anonymous, so entries are shared by everyone with the same risk
+    profile. Only generic first turns qualify: later replies depend on the
+    history, and any figure, name or personal detail barely moves the
+    embedding while being quoted back in the reply. Turns with a live quote
+    are skipped too — the reply would cite a price that may no longer match
+    the market_data returned next to it, and quotes change too often to hit.
+    """
+    if len(contents) != 1 or market_data or not _is_generic_question(user_message):
+        return None, None, None
+    cache_ns = (user_profile,)
+    embedding = _embed(user_message)
+    if embedding is None:
+        return None, None, None
+    return _chat_cache.get(cache_ns, embedding), cache_ns, embedding
+
+
+def _gemini_error_reply(e: Exception) -> str:
+    """Log a failed Gemini call and return the message shown to the user."""
+    if isinstance(e, genai_errors.ClientError):
         # Log the real error so it appears in the server console
         logger.error(f"Gemini ClientError {e.code} [{e.status}]: {e.message}")
         if e.code == 429:
@@ -199,37 +279,100 @@ REGLAS DE SALUDO Y CONTEXTO:
         # Any other 4xx (bad model name, invalid request, auth error…)
         return f"Error del servicio de IA (código {e.code}: {e.status}). Por favor intenta de nuevo."
 
-    except genai_errors.ServerError as e:
+    if isinstance(e, genai_errors.ServerError):
         logger.error(f"Gemini ServerError {e.code}: {e.message}")
         return "El servicio de IA está temporalmente no disponible. Intenta en unos segundos."
 
+    # Catch-all — prints the real exception type so you can diagnose it
+    logger.error(f"Unexpected error in Gemini chat call: {type(e).__name__}: {e}")
+    return "Lo siento, ocurrió un error inesperado. Por favor intenta de nuevo."
+
+
+def get_unified_analysis(
+    user_message: str,
+    user_profile: str,
+    market_data: Optional[dict] = None,
+    history: Optional[list] = None,
+) -> str:
+    contents, config = _prepare_chat(user_message, user_profile, market_data, history)
+
+    cached, cache_ns, embedding = _lookup_cached_reply(user_message, user_profile, market_data, contents)
+    if cached is not None:
+        return cached
+
+    # ── Call Gemini — only this block is wrapped ───────────────────────────────
+    try:
+        response = client.models.generate_content(
+            model=MODEL_NAME, contents=contents, config=config
+        )
+        if embedding is not None and response.text:
+            _chat_cache.set(cache_ns, embedding, response.text)
+        return response.text
     except Exception as e:
-        # Catch-all — prints the real exception type so you can diagnose it
-        logger.error(f"Unexpected error in get_unified_analysis: {type(e).__name__}: {e}")
-        return "Lo siento, ocurrió un error inesperado. Por favor intenta de nuevo."
+        return _gemini_error_reply(e)
+
+
+def stream_unified_analysis(
+    user_message: str,
+    user_profile: str,
+    market_data: Optional[dict] = None,
+    history: Optional[list] = None,
+) -> Iterator[str]:
+    """Same as get_unified_analysis, but yields the reply text as Gemini generates it."""
+    contents, config = _prepare_chat(user_message, user_profile, market_data, history)
+
+    cached, cache_ns, embedding = _lookup_cached_reply(user_message, user_profile, market_data, contents)
+    if cached is not None:
+        yield cached
+        return
+
+    parts: list[str] = []
+    try:
+        for chunk in client.models.generate_content_stream(
+            model=MODEL_NAME, contents=contents, config=config
+        ):
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+    except Exception as e:
+        yield _gemini_error_reply(e)
+        return
+
+    if embedding is not None and parts:
+        _chat_cache.set(cache_ns, embedding, "".join(parts))
 
 
 # ─── Ticker Extraction ──────────────────────────────────────────────────────────
 
-STOP_WORDS = {
+STOP_WORDS = frozenset({
     "HOY", "COMO", "ESTA", "ACCION", "RIESGO", "BAJO", "INVERTIR",
     "SECTORES", "PRECIO", "PARA", "QUE", "UNA", "LAS", "LOS", "DEL",
-    "CON", "POR", "MAS", "SUS", "HAY", "SON", "CUAL", "ESTA",
-    "DEBO", "PUEDO", "DEBERIA", "QUIERO", "HACER", "TIENE", "TIENE",
-    "CUANTO", "VALE", "COTIZA", "MERCADO", "BOLSA", "MEJOR", "PEOR"
-}
+    "CON", "POR", "MAS", "SUS", "HAY", "SON", "CUAL",
+    "DEBO", "PUEDO", "DEBERIA", "QUIERO", "HACER", "TIENE",
+    "CUANTO", "VALE", "COTIZA", "MERCADO", "BOLSA", "MEJOR", "PEOR",
+})
+
+
+# Single-pass matcher over every keyword. Longer keywords come first so that
+# at any position the alternation prefers e.g. "sp500" over a shorter prefix.
+_KEYWORD_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(kw) for kw in sorted(KEYWORD_TO_TICKER, key=len, reverse=True))
+    + r")\b"
+)
+_DOLLAR_TICKER_RE = re.compile(r"\$([A-Z]{1,5}(?:-USD)?)")
 
 
 def extract_ticker_from_message(message: str) -> str:
     lower_msg = message.lower()
 
-    # 1. Match known keywords (bitcoin, apple, tesla, etc.)
-    for keyword, ticker in KEYWORD_TO_TICKER.items():
-        if re.search(r'\b' + re.escape(keyword) + r'\b', lower_msg):
-            return ticker
+    # 1. Match known keywords (bitcoin, apple, tesla, etc.) — longest match wins
+    matches = [m.group(0) for m in _KEYWORD_RE.finditer(lower_msg)]
+    if matches:
+        return KEYWORD_TO_TICKER[max(matches, key=len)]
 
     # 2. Explicit $TICKER notation (e.g. $AAPL, $BTC-USD)
-    dollar_match = re.search(r"\$([A-Z]{1,5}(?:-USD)?)", message.upper())
+    dollar_match = _DOLLAR_TICKER_RE.search(message.upper())
     if dollar_match:
         return dollar_match.group(1)
 
@@ -1,41 +1,126 @@
 """
 auth.py — JWT Authentication logic for Investi
 """
+import base64
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import os
+import time
 import bcrypt
-from jose import JWTError, jwt
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from database import get_db
 from models import User
+from core.cache import TTLCache, ttl_cache  # type: ignore
 
 # ─── Config ──────────────────────────────────────────────────────────────────
 SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY:
     raise RuntimeError("SECRET_KEY environment variable is required")
-ALGORITHM = "HS256"
+_SECRET_BYTES = SECRET_KEY.encode("utf-8")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 horas
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 # ─── Password Utils ───────────────────────────────────────────────────────────
+# argon2id with the OWASP baseline parameters. Rows created before the switch
+# still hold bcrypt hashes ("$2b$…") and keep verifying through bcrypt.
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# Dedicated executor for hashing so login bursts can't starve the default one.
+# bcrypt and argon2-cffi release the GIL, so threads already run on all cores.
+HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return _password_hasher.hash(password)
+
+# Verified against when the login email is unknown, so that path costs the
+# same KDF time as a wrong password and can't be used to probe for accounts
+DUMMY_HASH = _password_hasher.hash("x" * 16)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    if hashed.startswith("$2"):
+        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    try:
+        return _password_hasher.verify(hashed, plain)
+    except (VerificationError, InvalidHashError):
+        return False
+
+# Recently successful logins, keyed by an HMAC of (user id, stored hash,
+# password) — so a password change invalidates them and no plaintext is kept.
+# Failures are never remembered: a wrong password always pays the full KDF.
+_verified_logins = TTLCache(ttl=60, maxsize=100_000)
+
+def _login_key(user_id: int, plain: str, hashed: str) -> bytes:
+    return hmac.new(_SECRET_BYTES, f"{user_id}|{hashed}|{plain}".encode("utf-8"), hashlib.sha256).digest()
+
+def recently_verified(user_id: int, plain: str, hashed: str) -> bool:
+    return _verified_logins.get(_login_key(user_id, plain, hashed), False)
+
+def remember_verified(user_id: int, plain: str, hashed: str) -> None:
+    _verified_logins.set(_login_key(user_id, plain, hashed), True)
+
+# email → (id, password_hash, name, risk_profile) row for login. Per process,
+# so anything that changes one of those columns must pop the user's email.
+LOGIN_LOOKUP_CACHE = TTLCache(ttl=60, maxsize=10_000)
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True for legacy bcrypt hashes or argon2 hashes made with older parameters."""
+    return hashed.startswith("$2") or _password_hasher.check_needs_rehash(hashed)
 
 # ─── Token Utils ──────────────────────────────────────────────────────────────
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+# Every token we issue has the same header, so its encoding is a constant
+_JWT_HEADER_B64 = b"eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"  # {"alg":"HS256","typ":"JWT"}
+
+def _b64url(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """HS256 JWT signed directly with hmac (OpenSSL), claims encoded with orjson."""
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": int(expire.timestamp())})
+    signing_input = _JWT_HEADER_B64 + b"." + _b64url(orjson.dumps(to_encode))
+    signature = hmac.new(_SECRET_BYTES, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("ascii")
+
+@ttl_cache(ttl=60, maxsize=10000)
+def _cached_access_token(sub: str, minute: int) -> str:
+    return create_access_token(
+        data={"sub": sub},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+def issue_access_token(user_id: int) -> str:
+    """Login/register token for a user, reused for repeat calls within the same minute."""
+    return _cached_access_token(str(user_id), int(time.time() // 60))
 
 # ─── Current User Dependency ──────────────────────────────────────────────────
+@ttl_cache(ttl=30, maxsize=50000)
+def _decode_token(token: str) -> dict:
+    """Verified claims for a raw token. Invalid tokens raise and are never cached.
+
+    Only tokens with our exact HS256 header are accepted, which also rules out
+    "alg": "none" and algorithm-confusion tricks.
+    """
+    parts = token.encode("ascii").split(b".")
+    if len(parts) != 3 or parts[0] != _JWT_HEADER_B64:
+        raise ValueError("Unsupported token header")
+    expected = _b64url(hmac.new(_SECRET_BYTES, parts[0] + b"." + parts[1], hashlib.sha256).digest())
+    if not hmac.compare_digest(expected, parts[2]):
+        raise ValueError("Invalid token signature")
+    claims = orjson.loads(base64.urlsafe_b64decode(parts[1] + b"=" * (-len(parts[1]) % 4)))
+    if not isinstance(claims, dict):
+        raise ValueError("Invalid token claims")
+    return claims
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -46,12 +131,15 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            raise credentials_exception  # cached claims outlived the token
         user_id_raw = payload.get("sub")
         if user_id_raw is None:
             raise credentials_exception
         user_id = int(user_id_raw)
-    except (JWTError, ValueError, TypeError):
+    except (ValueError, TypeError):
         raise credentials_exception
 
     user = db.query(User).filter(User.id == user_id).first()
@@ -3,9 +3,12 @@ calculator.py — Financial projection calculator using yfinance historical data
 """
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import logging
 from typing import Optional
 
+from core.cache import ttl_cache  # type: ignore
+
 logger = logging.getLogger(__name__)
 
 # Friendly name mapping
@@ -25,9 +28,18 @@ ASSET_NAMES = {
 }
 
 
+@ttl_cache(ttl=3600, maxsize=256)
+def _get_close_history(ticker: str) -> pd.Series:
+    """2 years of daily closes. Shared by every amount/term asked for the same ticker."""
+    hist = yf.Ticker(ticker).history(period="2y")
+    closes = hist["Close"] if "Close" in hist else pd.Series(dtype=float)
+    closes.index = pd.to_datetime(closes.index)
+    return closes
+
+
 def calculate_projection(ticker: str, amount: float, months: int) -> dict:
     """
-    Calculate projected return based on historical average monthly returns.
+    Calculate projected return based on the historical geometric mean monthly return.
 
     Args:
         ticker: Stock/crypto ticker symbol (e.g. 'AAPL', 'BTC-USD')
@@ -40,38 +52,39 @@ def calculate_projection(ticker: str, amount: float, months: int) -> dict:
     ticker = ticker.upper().strip()
 
     try:
-        stock = yf.Ticker(ticker)
         # Get 2 years of history to compute average returns
-        hist = stock.history(period="2y")
+        closes = _get_close_history(ticker)
 
-        if hist.empty or len(hist) < 20:
+        if closes.empty or len(closes) < 20:
             return {"error": f"No hay datos históricos suficientes para {ticker}"}
 
         # Calculate monthly returns from daily close prices
-        hist.index = pd.to_datetime(hist.index)
-        monthly_prices = hist["Close"].resample("ME").last()
+        monthly_prices = closes.resample("ME").last()
 
         if len(monthly_prices) < 2:
             return {"error": f"Datos insuficientes para calcular retorno mensual de {ticker}"}
 
-        monthly_returns = monthly_prices.pct_change().dropna()
-        avg_monthly_return = float(monthly_returns.mean())
+        # Geometric mean monthly return — the constant rate that compounds from
+        # the first to the last month-end close, consistent with the projection
+        n_periods = len(monthly_prices) - 1
+        avg_monthly_return = float((monthly_prices.iloc[-1] / monthly_prices.iloc[0]) ** (1.0 / n_periods) - 1.0)
         data_period = f"{monthly_prices.index[0].strftime('%b %Y')} – {monthly_prices.index[-1].strftime('%b %Y')}"
 
-        # Project forward month by month
-        monthly_breakdown = []
-        current_value = amount
-
-        for m in range(1, months + 1):
-            current_value = current_value * (1 + avg_monthly_return)
-            gain = current_value - amount
-            gain_pct = (gain / amount) * 100
-            monthly_breakdown.append({
-                "month": m,
-                "value": round(current_value, 2),
-                "gain": round(gain, 2),
-                "gain_pct": round(gain_pct, 2),
-            })
+        # Project forward: value_m = amount · (1 + r)^m, all months at once
+        month_numbers = np.arange(1, months + 1)
+        values = amount * np.power(1 + avg_monthly_return, month_numbers)
+        gains = values - amount
+        gain_pcts = gains / amount * 100
+
+        monthly_breakdown = [
+            {"month": m, "value": v, "gain": g, "gain_pct": p}
+            for m, v, g, p in zip(
+                month_numbers.tolist(),
+                np.round(values, 2).tolist(),
+                np.round(gains, 2).tolist(),
+                np.round(gain_pcts, 2).tolist(),
+            )
+        ]
 
         final_value = monthly_breakdown[-1]["value"]
         total_gain = final_value - amount
@@ -1,42 +1,121 @@
 """
-core/cache.py — Simple TTL in-memory cache decorator
+core/cache.py — Simple TTL in-memory cache decorator and map
 
 Uses per-key locking so that a slow external call (yfinance, LLM API) for
 one cache key does not block threads serving a different key.
 """
 import time
 import functools
+from collections import OrderedDict
+from contextlib import contextmanager
 from threading import Lock
 
-_cache: dict = {}
-_key_locks: dict = {}
-_meta_lock = Lock()  # protects _key_locks itself
+_key_locks: dict = {}  # key → [lock, waiters]; only keys with calls in flight
+_meta_lock = Lock()    # protects _key_locks itself
+_registry: dict = {}   # "module.qualname" → decorated function, for cache_stats()
 
 
-def _get_key_lock(key) -> Lock:
+@contextmanager
+def _key_lock(key):
     with _meta_lock:
-        if key not in _key_locks:
-            _key_locks[key] = Lock()
-        return _key_locks[key]
+        entry = _key_locks.get(key)
+        if entry is None:
+            entry = _key_locks[key] = [Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _meta_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _key_locks[key]
 
 
-def ttl_cache(ttl: int = 60):
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe key → value map whose entries expire after `ttl` seconds.
+
+    For values that aren't a function's return value (e.g. remembered
+    successes), and the store behind ttl_cache. With `maxsize`, holds at most
+    that many entries, evicting least recently used.
+    """
+
+    def __init__(self, ttl: int, maxsize: int | None = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._store: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None and time.monotonic() - entry["ts"] < self.ttl:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return entry["value"]
+            if entry is not None:
+                del self._store[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._store[key] = {"value": value, "ts": time.monotonic()}
+            self._store.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._store) > self.maxsize:
+                    self._store.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._store.pop(key, None)
+            return default if entry is None else entry["value"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses,
+                "size": len(self._store), "maxsize": self.maxsize, "ttl": self.ttl,
+            }
+
+
+def ttl_cache(ttl: int = 60, maxsize: int | None = None):
     """Decorator that caches a function's return value for `ttl` seconds.
 
     Per-key locking ensures only one thread executes the underlying function
     for a given key while others wait, without blocking unrelated keys.
+    With `maxsize`, the least recently used entries are evicted beyond that
+    many keys — use it whenever arguments come from user input.
     """
     def decorator(func):
+        store = TTLCache(ttl=ttl, maxsize=maxsize)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
-            key_lock = _get_key_lock(key)
-            with key_lock:
-                entry = _cache.get(key)
-                if entry and (time.monotonic() - entry["ts"]) < ttl:
-                    return entry["value"]
-                value = func(*args, **kwargs)
-                _cache[key] = {"value": value, "ts": time.monotonic()}
+            with _key_lock(key):
+                value = store.get(key, _MISSING)
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    store.set(key, value)
                 return value
+
+        wrapper.cache_info = store.info
+        wrapper.cache_clear = store.clear
+        _registry[f"{func.__module__}.{func.__qualname__}"] = wrapper
         return wrapper
     return decorator
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters and sizes of every ttl_cache-decorated function."""
+    return {name: fn.cache_info() for name, fn in sorted(_registry.items())}
@@ -0,0 +1,16 @@
+"""
+core/responses.py — orjson-backed JSON response class
+
+For routers that return plain dicts (no response_model). Routes with a
+response_model are better left on FastAPI's default class, which serializes
+them straight through Pydantic.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -0,0 +1,111 @@
+"""
+core/semantic_cache.py — In-process semantic cache for LLM replies
+
+Replies are stored next to the embedding of the prompt that produced them and
+returned again when a new prompt in the same namespace is close enough by
+cosine similarity. Namespaces keep entries generated under different context
+(risk profile, market snapshot…) from ever being served to each other.
+"""
+import time
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+from typing import Hashable, Optional, Sequence
+
+import numpy as np
+
+
+class SemanticCache:
+    """Thread-safe cosine-similarity cache with TTL and LRU eviction.
+
+    Eviction kicks in when either `maxsize` entries or `max_bytes` of stored
+    reply text + vectors is exceeded, dropping least recently used first.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl: int = 3600,
+        maxsize: int = 1024,
+        max_bytes: int = 8 * 1024 * 1024,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()  # id → entry, LRU order
+        self._namespaces: dict = {}                 # namespace → set of ids
+        self._ids = count()
+        self._bytes = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else None
+
+    def _drop(self, entry_id) -> None:
+        entry = self._entries.pop(entry_id)
+        ids = self._namespaces[entry["namespace"]]
+        ids.discard(entry_id)
+        if not ids:
+            del self._namespaces[entry["namespace"]]
+        self._bytes -= entry["size"]
+
+    def get(self, namespace: Hashable, embedding: Sequence[float]) -> Optional[str]:
+        """Return the cached reply most similar to `embedding`, or None."""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            now = time.monotonic()
+            candidates = []
+            for entry_id in list(self._namespaces.get(namespace, ())):
+                if now - self._entries[entry_id]["ts"] >= self.ttl:
+                    self._drop(entry_id)
+                else:
+                    candidates.append(entry_id)
+            if not candidates:
+                return None
+
+            matrix = np.stack([self._entries[i]["vec"] for i in candidates])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if float(scores[best]) < self.threshold:
+                return None
+
+            entry_id = candidates[best]
+            self._entries.move_to_end(entry_id)
+            return self._entries[entry_id]["reply"]
+
+    def set(self, namespace: Hashable, embedding: Sequence[float], reply: str) -> None:
+        """Store `reply` for `embedding` under `namespace`."""
+        vec = self._normalize(embedding)
+        if vec is None:
+            return
+
+        size = vec.nbytes + len(reply.encode("utf-8"))
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = {
+                "namespace": namespace,
+                "vec": vec,
+                "reply": reply,
+                "ts": time.monotonic(),
+                "size": size,
+            }
+            self._namespaces.setdefault(namespace, set()).add(entry_id)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.maxsize or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._namespaces.clear()
+            self._bytes = 0
@@ -1,5 +1,6 @@
-from sqlalchemy import create_engine
-from sqlalchemy.engine import URL
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from urllib.parse import unquote
@@ -36,9 +37,43 @@ else:
     DATABASE_URL = _raw
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    pool_size=20,
+    max_overflow=40,
+    pool_recycle=1800,
+    pool_pre_ping=True,
+)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async engine on the same database, for endpoints that await their queries
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername=_ASYNC_DRIVERS[engine.dialect.name])
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=20,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a write is in progress
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -52,6 +87,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Async dependency injector — yields an AsyncSession."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Create all tables on startup."""
     from models import User, Profile  # noqa: F401
@@ -60,4 +101,8 @@ def init_db():
         UserLessonProgress, Achievement, UserAchievement,
     )
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add indexes declared after the fact
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     
\ No newline at end of file
@@ -1,27 +1,33 @@
 """
 main.py — FastAPI application entry point for Investi AI Backend
 """
+import asyncio
+import hmac
 import logging
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI  # type: ignore
+from fastapi import FastAPI, Header, HTTPException, Request  # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
 from slowapi import _rate_limit_exceeded_handler  # type: ignore
 from slowapi.errors import RateLimitExceeded  # type: ignore
 from dotenv import load_dotenv  # type: ignore
 
+# Load .env before the app modules below — database, auth and ai_advisor read
+# DATABASE_URL, SECRET_KEY and GEMINI_API_KEY at import time.
+load_dotenv()
+
 from database import get_db, init_db  # type: ignore
+from core.cache import cache_stats  # type: ignore
 from core.limiter import limiter  # type: ignore
 from router_auth import router as auth_router  # type: ignore
 from router_education import router as education_router  # type: ignore
 from routers.chat import router as chat_router  # type: ignore
-from routers.market import router as market_router  # type: ignore
+from routers.market import router as market_router, refresh_top_assets_loop  # type: ignore
 from routers.calculator import router as calculator_router  # type: ignore
 from routers.risk import router as risk_router  # type: ignore
 from routers.users import router as users_router  # type: ignore
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -52,7 +58,10 @@ async def lifespan(app: FastAPI):
         db.close()
 
     logger.info("Database ready.")
+
+    top_assets_task = asyncio.create_task(refresh_top_assets_loop())
     yield
+    top_assets_task.cancel()
 
 
 app = FastAPI(title="Investi AI Backend", version="4.0.0", lifespan=lifespan)
@@ -93,3 +102,19 @@ app.include_router(users_router)
 @app.get("/")
 def read_root():
     return {"status": "Investi AI Backend is Running", "version": "4.0.0"}
+
+
+# ─── Ops ──────────────────────────────────────────────────────────────────────
+# Cache sizes reveal internals (live tokens, recent logins), so the endpoint
+# only exists when OPS_TOKEN is set and requires it in the X-Ops-Token header.
+
+OPS_TOKEN = os.getenv("OPS_TOKEN")
+
+if OPS_TOKEN:
+    @app.get("/api/cache/info", include_in_schema=False)
+    @limiter.limit("10/minute")
+    def cache_info(request: Request, x_ops_token: str = Header("")):
+        """Hit/miss counters and sizes of the in-memory TTL caches."""
+        if not hmac.compare_digest(x_ops_token.encode("utf-8"), OPS_TOKEN.encode("utf-8")):
+            raise HTTPException(status_code=403, detail="Acceso denegado")
+        return {"caches": cache_stats()}
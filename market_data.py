@@ -3,8 +3,12 @@ market_data.py — Real-time market data using yfinance (reliable, no scraping)
 """
 import yfinance as yf
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from calculator import ASSET_NAMES  # type: ignore
+from core.cache import ttl_cache  # type: ignore
+
 logger = logging.getLogger(__name__)
 
 # Curated list of assets for the markets hub
@@ -61,17 +65,25 @@ KEYWORD_TO_TICKER = {
     "oro": "GLD", "gold": "GLD", "gld": "GLD",
 }
 
+# Static ticker → display name lookup, checked before hitting yfinance .info
+_KNOWN_NAMES = {**{a["ticker"]: a["name"] for a in TOP_ASSETS}, **ASSET_NAMES}
+
+
+def resolve_ticker(query: str) -> str:
+    """Resolve a ticker from the keyword map, or use the query directly."""
+    return KEYWORD_TO_TICKER.get(query.lower(), query.upper())
+
 
 def get_market_data(query: str) -> dict:
     """
     Get market data for a query string (ticker or company name).
-    Uses keyword mapping first, then direct yfinance lookup.
+    Uses keyword mapping first, then direct yfinance lookup. Quotes are
+    cached per resolved ticker, so "bitcoin", "btc" and "BTC-USD" share one.
     """
     if not query or query == "UNKNOWN":
         return {"error": "No se identificó un activo válido en tu mensaje"}
 
-    # Resolve ticker from keyword map or use query directly
-    ticker = KEYWORD_TO_TICKER.get(query.lower(), query.upper())
+    ticker = resolve_ticker(query)
     logger.info(f"Fetching market data: query='{query}' → ticker='{ticker}'")
 
     return _get_yfinance_data(ticker)
@@ -121,12 +133,12 @@ def get_top_assets() -> list:
 
     except Exception as e:
         logger.error(f"Batch download failed: {e}")
-        # Fallback: individual requests
-        for asset in TOP_ASSETS:
-            item = _get_yfinance_data(asset["ticker"])
-            if item and "error" not in item:
-                item["category"] = asset["category"]
-                results.append(item)
+        # Fallback: individual requests, issued concurrently
+        with ThreadPoolExecutor(max_workers=len(TOP_ASSETS)) as pool:
+            items = pool.map(lambda a: _get_yfinance_data(a["ticker"]), TOP_ASSETS)
+            for asset, item in zip(TOP_ASSETS, items):
+                if item and "error" not in item:
+                    results.append({**item, "category": asset["category"]})
 
     return results
 
@@ -206,6 +218,20 @@ def get_sparkline_data(ticker_symbol: str) -> dict:
         return {"ticker": ticker_symbol, "prices": []}
 
 
+@ttl_cache(ttl=86400, maxsize=512)
+def _resolve_name(ticker_symbol: str) -> str:
+    """Friendly name for a ticker: static maps first, yfinance .info only for unknown tickers.
+
+    yfinance errors propagate so a transient failure (e.g. a 429) isn't cached
+    for a day — the caller falls back to the symbol for that one call.
+    """
+    if ticker_symbol in _KNOWN_NAMES:
+        return _KNOWN_NAMES[ticker_symbol]
+    info = yf.Ticker(ticker_symbol).info
+    return info.get("longName") or info.get("shortName") or ticker_symbol
+
+
+@ttl_cache(ttl=60, maxsize=512)
 def _get_yfinance_data(ticker_symbol: str) -> dict:
     """
     Fetch data for a single ticker using yfinance.
@@ -226,11 +252,10 @@ def _get_yfinance_data(ticker_symbol: str) -> dict:
         change = price - prev_price
         change_pct = (change / prev_price) * 100 if prev_price != 0 else 0
 
-        # Try to get a friendly name from info
         try:
-            info = ticker.info
-            name = info.get("longName") or info.get("shortName") or ticker_symbol.upper()
-        except Exception:
+            name = _resolve_name(ticker_symbol.upper())
+        except Exception as e:
+            logger.warning(f"yfinance name lookup failed for {ticker_symbol}: {e}")
             name = ticker_symbol.upper()
 
         return {
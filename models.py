@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text  # type: ignore
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index  # type: ignore
 from sqlalchemy.orm import relationship  # type: ignore
 from database import Base  # type: ignore
 from core.utils import utcnow as _now  # type: ignore
@@ -16,7 +16,17 @@ class User(Base):
     risk_profile = Column(String(20), nullable=True)   # Conservador | Moderado | Agresivo
     created_at = Column(DateTime(timezone=True), default=_now)
 
-    profiles = relationship("Profile", back_populates="owner")
+    # No code path walks these; fail loudly instead of issuing a lazy SELECT
+    profiles = relationship("Profile", back_populates="owner", lazy="raise_on_sql")
+
+    # Login reads only these columns by email — let Postgres answer it as an
+    # index-only scan. INCLUDE is Postgres-specific, so other dialects skip it.
+    __table_args__ = (
+        Index(
+            "ix_users_email_covering", email,
+            postgresql_include=["id", "password_hash", "name", "risk_profile"],
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
 class Profile(Base):
@@ -28,4 +38,9 @@ class Profile(Base):
     test_answers = Column(Text, nullable=True)         # JSON string of Q&A pairs
     created_at = Column(DateTime(timezone=True), default=_now)
 
-    owner = relationship("User", back_populates="profiles")
\ No newline at end of file
+    owner = relationship("User", back_populates="profiles", lazy="raise_on_sql")
+
+    # Serves "latest profile for user" as an index seek
+    __table_args__ = (
+        Index("ix_profile_user_created", user_id, created_at.desc()),
+    )
\ No newline at end of file
@@ -1,15 +1,22 @@
 """
 router_auth.py — Register & Login endpoints for Investi
 """
-from fastapi import APIRouter, HTTPException, Depends, Request
+import asyncio
+import re
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
-from database import get_db
+from pydantic import BaseModel, Field, field_validator
+from database import get_async_db
 from models import User
-from auth import hash_password, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import (
+    hash_password, verify_password, password_needs_rehash,
+    recently_verified, remember_verified, issue_access_token,
+    HASH_POOL, DUMMY_HASH, LOGIN_LOOKUP_CACHE,
+)
 from schemas import RiskProfile  # type: ignore
 from core.limiter import limiter  # type: ignore
 
@@ -17,14 +24,26 @@ router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 # ─── Schemas locales ──────────────────────────────────────────────────────────
 
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
 class RegisterRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
-    email: EmailStr
+    email: str = Field(..., max_length=200)
     password: str = Field(..., min_length=6, max_length=128)
     age: Optional[int] = Field(None, ge=18, le=100)
     monthly_income: Optional[float] = Field(None, ge=0)
     risk_profile: Optional[RiskProfile] = None
 
+    @field_validator("email")
+    @classmethod
+    def _check_email(cls, value: str) -> str:
+        value = value.strip()
+        if not EMAIL_RE.fullmatch(value):
+            raise ValueError("Email inválido")
+        # Same normalization EmailStr applied: the domain part is case-insensitive
+        local, domain = value.rsplit("@", 1)
+        return f"{local}@{domain.lower()}"
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
@@ -32,46 +51,77 @@ class TokenResponse(BaseModel):
     name: str
     risk_profile: Optional[RiskProfile] = None
 
+def _token_response(user_id: int, name: str, risk_profile: Optional[str], status_code: int = 200) -> Response:
+    """Serialize TokenResponse once via pydantic-core, skipping FastAPI's response re-validation."""
+    body = TokenResponse(
+        access_token=issue_access_token(user_id),
+        token_type="bearer",
+        user_id=user_id,
+        name=name,
+        risk_profile=risk_profile,
+    )
+    return Response(content=body.model_dump_json(), media_type="application/json", status_code=status_code)
+
 # ─── Register ─────────────────────────────────────────────────────────────────
 
 @router.post("/register", response_model=TokenResponse, status_code=201)
 @limiter.limit("5/minute")
-def register(request: Request, data: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: Request, data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """Creates a new user with hashed password and returns a JWT token."""
-    existing = db.query(User).filter(User.email == data.email).first()
-    if existing:
-        raise HTTPException(status_code=409, detail="Este email ya está registrado")
+    # Hashing is CPU-bound — run it off the event loop
+    loop = asyncio.get_running_loop()
+    password_hash = await loop.run_in_executor(HASH_POOL, hash_password, data.password)
 
     user = User(
         name=data.name,
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=password_hash,
         age=data.age,
         monthly_income=data.monthly_income,
         risk_profile=data.risk_profile,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # users.email is UNIQUE — let the INSERT detect duplicates instead of a racy pre-check
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Este email ya está registrado")
+    LOGIN_LOOKUP_CACHE.pop(user.email)
+    # id is filled in at flush and the session doesn't expire on commit — no refresh SELECT
 
-    token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    return {"access_token": token, "token_type": "bearer", "user_id": user.id, "name": user.name, "risk_profile": user.risk_profile}
+    return _token_response(user.id, user.name, user.risk_profile, status_code=201)
 
 # ─── Login ────────────────────────────────────────────────────────────────────
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("10/minute")
-def login(request: Request, form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(request: Request, form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Authenticates user and returns a JWT token."""
-    user = db.query(User).filter(User.email == form.username).first()
-    if not user or not user.password_hash or not verify_password(form.password, user.password_hash):
+    user = LOGIN_LOOKUP_CACHE.get(form.username)
+    if user is None:
+        # Only the columns login needs — no ORM entity hydration
+        stmt = select(User.id, User.password_hash, User.name, User.risk_profile).where(User.email == form.username)
+        user = (await db.execute(stmt)).first()
+        if user is not None:
+            LOGIN_LOOKUP_CACHE.set(form.username, user)
+    loop = asyncio.get_running_loop()
+    if not user or not user.password_hash:
+        await loop.run_in_executor(HASH_POOL, verify_password, form.password, DUMMY_HASH)
         raise HTTPException(status_code=401, detail="Email o contraseña incorrectos")
 
-    token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    return {"access_token": token, "token_type": "bearer", "user_id": user.id, "name": user.name, "risk_profile": user.risk_profile}
+    # Repeat logins with the same credentials within a minute skip the KDF
+    if not recently_verified(user.id, form.password, user.password_hash):
+        if not await loop.run_in_executor(HASH_POOL, verify_password, form.password, user.password_hash):
+            raise HTTPException(status_code=401, detail="Email o contraseña incorrectos")
+
+        password_hash = user.password_hash
+        # Upgrade legacy bcrypt / outdated argon2 hashes now that we have the plaintext
+        if password_needs_rehash(password_hash):
+            password_hash = await loop.run_in_executor(HASH_POOL, hash_password, form.password)
+            await db.execute(update(User).where(User.id == user.id).values(password_hash=password_hash))
+            await db.commit()
+            LOGIN_LOOKUP_CACHE.pop(form.username)
+        remember_verified(user.id, form.password, password_hash)
+
+    return _token_response(user.id, user.name, user.risk_profile)
@@ -7,8 +7,9 @@ from schemas import CalculatorRequest  # type: ignore
 from calculator import calculate_projection  # type: ignore
 from core.cache import ttl_cache  # type: ignore
 from core.limiter import limiter  # type: ignore
+from core.responses import ORJSONResponse  # type: ignore
 
-router = APIRouter(tags=["Calculator"])
+router = APIRouter(tags=["Calculator"], default_response_class=ORJSONResponse)
 
 
 @router.post("/api/calculate")
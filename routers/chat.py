@@ -1,16 +1,22 @@
 """
 routers/chat.py — Chat endpoint
 """
+import asyncio
+import json
 import re as _re
+from typing import Iterator
+
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 
 from schemas import ChatRequest
 from market_data import get_market_data  # type: ignore
-from ai_advisor import get_unified_analysis, extract_ticker_from_message  # type: ignore
+from ai_advisor import get_unified_analysis, stream_unified_analysis, extract_ticker_from_message  # type: ignore
 from core.limiter import limiter  # type: ignore
+from core.responses import ORJSONResponse  # type: ignore
 from core.constants import TRM_FALLBACK  # type: ignore
 
-router = APIRouter(tags=["Chat"])
+router = APIRouter(tags=["Chat"], default_response_class=ORJSONResponse)
 
 # Compile once at module level
 _AMOUNT_PATTERNS = [
@@ -39,17 +45,32 @@ def _detect_amount(message: str) -> dict | None:
     return None
 
 
+def _start_market_data_fetch(ticker: str) -> asyncio.Task | None:
+    """Fetch quotes on a worker thread so the event loop keeps serving requests."""
+    if ticker == "UNKNOWN":
+        return None
+    return asyncio.create_task(asyncio.to_thread(get_market_data, ticker))
+
+
+async def _finish_market_data_fetch(task: asyncio.Task | None) -> dict | None:
+    market_data = await task if task else None
+    if market_data and "error" in market_data:
+        return None
+    return market_data
+
+
 @router.post("/api/chat")
 @limiter.limit("10/minute")
 async def chat_endpoint(request: Request, body: ChatRequest):
     ticker = extract_ticker_from_message(body.message)
-    market_data = get_market_data(ticker) if ticker != "UNKNOWN" else None
-    if market_data and "error" in market_data:
-        market_data = None
+    market_task = _start_market_data_fetch(ticker)
 
     history = [{"role": m.role, "content": m.content} for m in body.history]
+    calculator_data = _detect_amount(body.message)
+    market_data = await _finish_market_data_fetch(market_task)
 
-    ai_reply = get_unified_analysis(
+    ai_reply = await asyncio.to_thread(
+        get_unified_analysis,
         user_message=body.message,
         user_profile=body.profile,
         market_data=market_data,
@@ -60,5 +81,42 @@ async def chat_endpoint(request: Request, body: ChatRequest):
         "reply": ai_reply,
         "market_data": market_data,
         "detected_ticker": ticker,
-        "calculator_data": _detect_amount(body.message),
+        "calculator_data": calculator_data,
+    }
+
+
+def _sse_event(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def _sse_chat_events(meta: dict, chunks: Iterator[str]) -> Iterator[str]:
+    """Metadata first, then one event per reply chunk, then a done marker."""
+    yield _sse_event({"type": "meta", **meta})
+    for text in chunks:
+        yield _sse_event({"type": "text", "text": text})
+    yield _sse_event({"type": "done"})
+
+
+@router.post("/api/chat/stream")
+@limiter.limit("10/minute")
+async def chat_stream_endpoint(request: Request, body: ChatRequest):
+    """Same as /api/chat, streamed as Server-Sent Events while Gemini generates."""
+    ticker = extract_ticker_from_message(body.message)
+    market_task = _start_market_data_fetch(ticker)
+
+    history = [{"role": m.role, "content": m.content} for m in body.history]
+    calculator_data = _detect_amount(body.message)
+    market_data = await _finish_market_data_fetch(market_task)
+
+    chunks = stream_unified_analysis(
+        user_message=body.message,
+        user_profile=body.profile,
+        market_data=market_data,
+        history=history,
+    )
+    meta = {
+        "market_data": market_data,
+        "detected_ticker": ticker,
+        "calculator_data": calculator_data,
     }
+    return StreamingResponse(_sse_chat_events(meta, chunks), media_type="text/event-stream")
@@ -1,20 +1,29 @@
 """
 routers/market.py — Market data and TRM endpoints
 """
+import asyncio
 import logging
+from email.utils import format_datetime
 import yfinance as yf  # type: ignore
-from fastapi import APIRouter, HTTPException, Request, Query, Path
+from fastapi import APIRouter, HTTPException, Request, Response, Query, Path
 
 from market_data import get_market_data, get_top_assets, _get_yfinance_data, get_sparkline_data, get_asset_detail  # type: ignore
 from core.cache import ttl_cache  # type: ignore
 from core.limiter import limiter  # type: ignore
+from core.responses import ORJSONResponse  # type: ignore
 from core.constants import TRM_FALLBACK  # type: ignore
+from core.utils import utcnow  # type: ignore
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Market"])
+router = APIRouter(tags=["Market"], default_response_class=ORJSONResponse)
 
 _TICKER_PATH = Path(..., min_length=1, max_length=20, pattern=r"^[A-Za-z0-9.\-=^]+$")
 
+TOP_ASSETS_REFRESH_SECONDS = 30
+
+# (assets, refreshed_at) — replaced as a whole by refresh_top_assets_loop()
+_top_assets_snapshot: tuple = (None, None)
+
 
 @router.get("/api/trm")
 @limiter.limit("30/minute")
@@ -35,14 +44,36 @@ def _get_trm_cached():
     return {"trm": TRM_FALLBACK, "source": "fallback"}
 
 
+async def refresh_top_assets_loop():
+    """Background task: rebuild the top-assets snapshot every TOP_ASSETS_REFRESH_SECONDS.
+
+    On upstream failure (or an empty result) the previous snapshot is kept,
+    so the endpoint keeps serving stale prices rather than nothing.
+    """
+    global _top_assets_snapshot
+    while True:
+        try:
+            assets = await asyncio.to_thread(get_top_assets)
+            if assets:
+                _top_assets_snapshot = (assets, utcnow())
+        except Exception as e:
+            logger.warning(f"Top assets refresh failed, serving last snapshot: {e}")
+        await asyncio.sleep(TOP_ASSETS_REFRESH_SECONDS)
+
+
 @router.get("/api/market/top")
 @limiter.limit("30/minute")
-def market_top_assets(request: Request):
+def market_top_assets(request: Request, response: Response):
     """Returns current prices for curated list of top assets."""
-    return {"assets": _get_top_assets_cached()}
+    assets, refreshed_at = _top_assets_snapshot
+    if assets is None:
+        # First refresh hasn't finished yet
+        return {"assets": _get_top_assets_cached()}
+    response.headers["Last-Modified"] = format_datetime(refreshed_at, usegmt=True)
+    return {"assets": assets}
 
 
-@ttl_cache(ttl=60)
+@ttl_cache(ttl=30)
 def _get_top_assets_cached():
     return get_top_assets()
 
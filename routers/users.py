@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from database import get_db  # type: ignore
 from models import User, Profile  # type: ignore
 from schemas import ProfileCreate, ProfileResponse, UserResponse  # type: ignore
-from auth import get_current_user  # type: ignore
+from auth import get_current_user, LOGIN_LOOKUP_CACHE  # type: ignore
 
 router = APIRouter(tags=["Users"])
 
@@ -36,6 +36,7 @@ def create_profile(
     # Denormalize onto User for quick access
     current_user.risk_profile = profile_data.risk_profile
     db.commit()
+    LOGIN_LOOKUP_CACHE.pop(current_user.email)
     db.refresh(db_profile)
     return db_profile
 